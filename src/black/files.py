@@ -1,11 +1,14 @@
+import copy
 import io
 import os
+import stat
 import sys
-from collections.abc import Iterable, Iterator, Sequence
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 from functools import lru_cache
 from pathlib import Path
 from re import Pattern
-from typing import TYPE_CHECKING, Any, Optional, Union
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Optional, TypeVar, Union
 
 from mypy_extensions import mypyc_attr
 from packaging.specifiers import InvalidSpecifier, Specifier, SpecifierSet
@@ -32,17 +35,145 @@
     import colorama  # noqa: F401
 
 
+K = TypeVar("K")
+V = TypeVar("V")
+
+_TARGET_VERSION_MAP: dict[str, TargetVersion] = {
+    f"3.{v.value}": v for v in TargetVersion
+}
+
+
+_EMPTY_MAPPING: Mapping[str, Any] = MappingProxyType({})
+# Turns option names like "line-length" into "line_length".
+_KEY_TRANS = str.maketrans("-", "_")
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively make TOML data read-only (tables to mappings, arrays to tuples)."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Undo `_freeze`, returning mutable dicts and lists."""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
 @lru_cache
-def _load_toml(path: Union[Path, str]) -> dict[str, Any]:
+def _load_toml(path: Union[Path, str]) -> Mapping[str, Any]:
+    # The result is shared by every caller through the cache, so freeze it.
     with open(path, "rb") as f:
-        return tomllib.load(f)
+        frozen: Mapping[str, Any] = _freeze(tomllib.load(f))
+    return frozen
 
 
 @lru_cache
 def _cached_resolve(path: Path) -> Path:
+    # `Path.resolve()` lstat()s every component of the path. For an absolute
+    # path whose last component isn't a symlink, resolve the parent through the
+    # cache instead, so repeated lookups of a directory are usually cache hits.
+    if sys.platform != "win32" and path.is_absolute() and ".." not in path.parts:
+        try:
+            is_symlink = path.is_symlink()
+        except OSError:
+            # e.g. a parent we can't traverse, which `Path.resolve()` tolerates.
+            is_symlink = True
+        if not is_symlink:
+            parent = path.parent
+            if parent == path:
+                return path
+            return _cached_resolve(parent) / path.name
     return path.resolve()
 
 
+# Maps each directory find_project_root() has probed to the project root marker
+# found in it, or None if it has none. Reset with clear_caches().
+_ROOT_MARKER_CACHE: dict[str, Optional[str]] = {}
+
+
+def _find_root_marker(directory: str) -> Optional[str]:
+    """Return a description of the project root marker in `directory`, if any."""
+    # A single readdir per directory instead of a stat() per marker file.
+    hg: Optional[os.DirEntry[str]] = None
+    pyproject: Optional[os.DirEntry[str]] = None
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name == ".git":
+                    # Takes precedence over the other markers, no need to look on.
+                    return ".git directory"
+                elif entry.name == ".hg":
+                    hg = entry
+                elif entry.name == "pyproject.toml":
+                    pyproject = entry
+    except OSError:
+        # Listing needs read permission, but an execute-only directory can
+        # still be searched for the markers by name.
+        return _probe_root_marker(directory)
+
+    if hg is not None and hg.is_dir():
+        return ".hg directory"
+
+    if pyproject is not None and pyproject.is_file():
+        return _pyproject_marker(pyproject.path)
+
+    return None
+
+
+def _probe_root_marker(directory: str) -> Optional[str]:
+    """Like `_find_root_marker`, but stat() each marker instead of listing."""
+    if os.path.exists(os.path.join(directory, ".git")):
+        return ".git directory"
+
+    if os.path.isdir(os.path.join(directory, ".hg")):
+        return ".hg directory"
+
+    pyproject = os.path.join(directory, "pyproject.toml")
+    if os.path.isfile(pyproject):
+        return _pyproject_marker(pyproject)
+
+    return None
+
+
+def _pyproject_marker(pyproject: str) -> Optional[str]:
+    pyproject_toml = _load_toml(pyproject)
+    if "black" in pyproject_toml.get("tool", _EMPTY_MAPPING):
+        return "pyproject.toml"
+    return None
+
+
+def _walk_up(path: str) -> Iterator[str]:
+    """Yield the absolute `path` followed by its ancestors, closest first."""
+    yield path
+    parent = os.path.dirname(path)
+    while parent != path:
+        yield parent
+        path, parent = parent, os.path.dirname(parent)
+
+
+def clear_caches() -> None:
+    """Forget everything cached about the file system by this module.
+
+    Long-running integrations should call this when files may have changed
+    between invocations.
+    """
+    _ROOT_MARKER_CACHE.clear()
+    _load_toml.cache_clear()
+    _parse_pyproject_toml.cache_clear()
+    _cached_resolve.cache_clear()
+    find_project_root.cache_clear()
+    find_user_pyproject_toml.cache_clear()
+    _GITIGNORE_CACHE.clear()
+    _PATHSPEC_BY_CONTENT.clear()
+
+
 @lru_cache
 def find_project_root(
     srcs: Sequence[str], stdin_filename: Optional[str] = None
@@ -67,32 +198,30 @@ def find_project_root(
     if not srcs:
         srcs = [str(_cached_resolve(Path.cwd()))]
 
-    path_srcs = [_cached_resolve(Path(Path.cwd(), src)) for src in srcs]
-
-    # A list of lists of parents for each 'src'. 'src' is included as a
-    # "parent" of itself if it is a directory
-    src_parents = [
-        list(path.parents) + ([path] if path.is_dir() else []) for path in path_srcs
-    ]
-
-    common_base = max(
-        set.intersection(*(set(parents) for parents in src_parents)),
-        key=lambda path: path.parts,
-    )
-
-    for directory in (common_base, *common_base.parents):
-        if (directory / ".git").exists():
-            return directory, ".git directory"
-
-        if (directory / ".hg").is_dir():
-            return directory, ".hg directory"
-
-        if (directory / "pyproject.toml").is_file():
-            pyproject_toml = _load_toml(directory / "pyproject.toml")
-            if "black" in pyproject_toml.get("tool", {}):
-                return directory, "pyproject.toml"
+    # Work on plain strings, constructing Path objects is comparatively slow.
+    cwd = os.getcwd()
+    path_srcs = [os.fspath(_cached_resolve(Path(cwd, src))) for src in srcs]
+
+    # The project root is searched for from the deepest directory containing
+    # every 'src'. 'src' counts as containing itself if it is a directory.
+    # Many sources are usually siblings, so only keep one entry per directory:
+    # once a source's parent is included, the source can't change the result.
+    bases: set[str] = set()
+    for path in path_srcs:
+        parent = os.path.dirname(path)
+        if parent not in bases:
+            bases.add(path if os.path.isdir(path) else parent)
+    common_base = os.path.commonpath(bases)
+
+    for directory in _walk_up(common_base):
+        if directory in _ROOT_MARKER_CACHE:
+            marker = _ROOT_MARKER_CACHE[directory]
+        else:
+            marker = _ROOT_MARKER_CACHE[directory] = _find_root_marker(directory)
+        if marker is not None:
+            return Path(directory), marker
 
-    return directory, "file system root"
+    return Path(directory), "file system root"
 
 
 def find_pyproject_toml(
@@ -123,9 +252,20 @@ def parse_pyproject_toml(path_config: str) -> dict[str, Any]:
 
     If parsing fails, will raise a tomllib.TOMLDecodeError.
     """
+    # The parsed config is cached, hand out a copy so callers can't modify it.
+    return copy.deepcopy(_parse_pyproject_toml(path_config))
+
+
+@lru_cache
+def _parse_pyproject_toml(path_config: str) -> dict[str, Any]:
     pyproject_toml = _load_toml(path_config)
-    config: dict[str, Any] = pyproject_toml.get("tool", {}).get("black", {})
-    config = {k.replace("--", "").replace("-", "_"): v for k, v in config.items()}
+    black_config = pyproject_toml.get("tool", _EMPTY_MAPPING).get(
+        "black", _EMPTY_MAPPING
+    )
+    config: dict[str, Any] = {
+        (k[2:] if k.startswith("--") else k).translate(_KEY_TRANS): _thaw(v)
+        for k, v in black_config.items()
+    }
 
     if "target_version" not in config:
         inferred_target_version = infer_target_version(pyproject_toml)
@@ -136,7 +276,7 @@ def parse_pyproject_toml(path_config: str) -> dict[str, Any]:
 
 
 def infer_target_version(
-    pyproject_toml: dict[str, Any],
+    pyproject_toml: Mapping[str, Any],
 ) -> Optional[list[TargetVersion]]:
     """Infer Black's target version from the project metadata in pyproject.toml.
 
@@ -145,13 +285,16 @@ def infer_target_version(
 
     If the target version cannot be inferred, returns None.
     """
-    project_metadata = pyproject_toml.get("project", {})
+    project_metadata = pyproject_toml.get("project", _EMPTY_MAPPING)
     requires_python = project_metadata.get("requires-python", None)
     if requires_python is not None:
-        try:
-            return parse_req_python_version(requires_python)
-        except InvalidVersion:
-            pass
+        # Every version specifier contains one of these operator characters and
+        # no plain version does, so don't bother raising InvalidVersion for them.
+        if not any(c in requires_python for c in "<>=~"):
+            try:
+                return parse_req_python_version(requires_python)
+            except InvalidVersion:
+                pass
         try:
             return parse_req_python_specifier(requires_python)
         except (InvalidSpecifier, InvalidVersion):
@@ -185,10 +328,9 @@ def parse_req_python_specifier(requires_python: str) -> Optional[list[TargetVers
     if not specifier_set:
         return None
 
-    target_version_map = {f"3.{v.value}": v for v in TargetVersion}
-    compatible_versions: list[str] = list(specifier_set.filter(target_version_map))
+    compatible_versions: list[str] = list(specifier_set.filter(_TARGET_VERSION_MAP))
     if compatible_versions:
-        return [target_version_map[v] for v in compatible_versions]
+        return [_TARGET_VERSION_MAP[v] for v in compatible_versions]
     return None
 
 
@@ -199,6 +341,7 @@ def strip_specifier_set(specifier_set: SpecifierSet) -> SpecifierSet:
     https://peps.python.org/pep-0440/#version-specifiers
     """
     specifiers = []
+    changed = False
     for s in specifier_set:
         if "*" in str(s):
             specifiers.append(s)
@@ -206,14 +349,20 @@ def strip_specifier_set(specifier_set: SpecifierSet) -> SpecifierSet:
             version = Version(s.version)
             stripped = Specifier(f"{s.operator}{version.major}.{version.minor}")
             specifiers.append(stripped)
+            if stripped != s:
+                changed = True
         elif s.operator == ">":
             version = Version(s.version)
             if len(version.release) > 2:
                 s = Specifier(f">={version.major}.{version.minor}")
+                changed = True
             specifiers.append(s)
         else:
             specifiers.append(s)
 
+    if not changed:
+        # Nothing was stripped, avoid re-parsing an identical specifier set.
+        return specifier_set
     return SpecifierSet(",".join(str(s) for s in specifiers))
 
 
@@ -237,19 +386,64 @@ def find_user_pyproject_toml() -> Path:
     return _cached_resolve(user_config_path)
 
 
-@lru_cache
+# Same bound as the default @lru_cache these dicts replace.
+_GITIGNORE_CACHE_SIZE = 128
+
+
+def _cache_get(cache: dict[K, V], key: K) -> Optional[V]:
+    """Look up `key` in a dict used as an LRU cache, marking it recently used."""
+    value = cache.pop(key, None)
+    if value is not None:
+        cache[key] = value
+    return value
+
+
+def _cache_put(cache: dict[K, V], key: K, value: V) -> None:
+    """Store `key` in a dict used as an LRU cache, evicting the oldest entries."""
+    cache.pop(key, None)
+    cache[key] = value
+    while len(cache) > _GITIGNORE_CACHE_SIZE:
+        del cache[next(iter(cache))]
+
+
+# Maps a directory to the (mtime, size) its .gitignore had when last read, or None
+# if there was none, and the PathSpec built from it. Reset with clear_caches().
+_GITIGNORE_CACHE: dict[Path, tuple[Optional[tuple[int, int]], PathSpec]] = {}
+# Maps the contents of a .gitignore file to the PathSpec compiled from it. Also
+# bounded, so stale versions of edited files eventually drop out.
+_PATHSPEC_BY_CONTENT: dict[str, PathSpec] = {}
+
+
 def get_gitignore(root: Path) -> PathSpec:
     """Return a PathSpec matching gitignore content if present."""
     gitignore = root / ".gitignore"
+    try:
+        st = gitignore.stat()
+    except OSError:
+        signature = None
+    else:
+        signature = (st.st_mtime_ns, st.st_size) if stat.S_ISREG(st.st_mode) else None
+    # A single stat() tells us whether the previously parsed file is still current.
+    cached = _cache_get(_GITIGNORE_CACHE, root)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
     lines: list[str] = []
-    if gitignore.is_file():
+    if signature is not None:
         with gitignore.open(encoding="utf-8") as gf:
             lines = gf.readlines()
-    try:
-        return PathSpec.from_lines("gitwildmatch", lines)
-    except GitWildMatchPatternError as e:
-        err(f"Could not parse {gitignore}: {e}")
-        raise
+    # Identical .gitignore files (common in monorepos) share one compiled PathSpec.
+    content = "".join(lines)
+    spec = _cache_get(_PATHSPEC_BY_CONTENT, content)
+    if spec is None:
+        try:
+            spec = PathSpec.from_lines("gitwildmatch", lines)
+        except GitWildMatchPatternError as e:
+            err(f"Could not parse {gitignore}: {e}")
+            raise
+        _cache_put(_PATHSPEC_BY_CONTENT, content, spec)
+    _cache_put(_GITIGNORE_CACHE, root, (signature, spec))
+    return spec
 
 
 def resolves_outside_root_or_cannot_stat(
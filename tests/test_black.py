@@ -26,6 +26,7 @@
 import pytest
 from click import unstyle
 from click.testing import CliRunner
+from packaging.specifiers import SpecifierSet
 from packaging.version import Version
 from pathspec import PathSpec
 
@@ -1514,6 +1515,22 @@ def test_parse_pyproject_toml(self) -> None:
         self.assertEqual(config["exclude"], r"\.pyi?$")
         self.assertEqual(config["include"], r"\.py?$")
 
+    def test_parse_pyproject_toml_returns_copy(self) -> None:
+        test_toml_file = str(THIS_DIR / "test.toml")
+        config = black.parse_pyproject_toml(test_toml_file)
+        config["line_length"] = 1
+        config["target_version"].append("py39")
+        config = black.parse_pyproject_toml(test_toml_file)
+        self.assertEqual(config["line_length"], 79)
+        self.assertEqual(config["target_version"], ["py36", "py37", "py38"])
+
+    def test_load_toml_is_read_only(self) -> None:
+        pyproject_toml = black.files._load_toml(str(THIS_DIR / "test.toml"))
+        black_config = pyproject_toml["tool"]["black"]
+        with self.assertRaises(TypeError):
+            black_config["line-length"] = 1
+        self.assertEqual(black_config["target-version"], ("py36", "py37", "py38"))
+
     def test_spellcheck_pyproject_toml(self) -> None:
         test_toml_file = THIS_DIR / "data" / "incorrect_spelling.toml"
         result = BlackRunner().invoke(
@@ -1545,6 +1562,7 @@ def test_infer_target_version(self) -> None:
         for version, expected in [
             ("3.6", [TargetVersion.PY36]),
             ("3.11.0rc1", [TargetVersion.PY311]),
+            (" 3.7 ", [TargetVersion.PY37]),
             (
                 ">=3.10",
                 [
@@ -1630,6 +1648,15 @@ def test_infer_target_version(self) -> None:
             result = black.files.infer_target_version(test_toml)
             self.assertEqual(result, expected)
 
+    def test_strip_specifier_set(self) -> None:
+        specifier_set = SpecifierSet(">=3.8")
+        self.assertIs(black.files.strip_specifier_set(specifier_set), specifier_set)
+        specifier_set = SpecifierSet(">=3.8,<4")
+        self.assertIs(black.files.strip_specifier_set(specifier_set), specifier_set)
+
+        stripped = black.files.strip_specifier_set(SpecifierSet(">=3.8.1"))
+        self.assertEqual(stripped, SpecifierSet(">=3.8"))
+
     def test_read_pyproject_toml(self) -> None:
         test_toml_file = THIS_DIR / "test.toml"
         fake_ctx = FakeContext()
@@ -1727,6 +1754,108 @@ def test_find_project_root(self) -> None:
                 (src_dir.resolve(), "pyproject.toml"),
             )
 
+    def test_find_project_root_vcs_markers(self) -> None:
+        with TemporaryDirectory() as workspace:
+            root = Path(workspace).resolve()
+            git_dir = root / "git_project"
+            (git_dir / ".git").mkdir(parents=True)
+            hg_dir = root / "hg_project"
+            (hg_dir / ".hg").mkdir(parents=True)
+            # A .hg *file* is not a marker
+            not_hg_dir = hg_dir / "sub"
+            not_hg_dir.mkdir()
+            (not_hg_dir / ".hg").touch()
+
+            self.assertEqual(
+                black.find_project_root((str(git_dir / "a.py"),)),
+                (git_dir, ".git directory"),
+            )
+            self.assertEqual(
+                black.find_project_root((str(git_dir / "a.py"), str(git_dir / "b.py"))),
+                (git_dir, ".git directory"),
+            )
+            # The common base of sources from both projects is `root`
+            self.assertEqual(
+                black.find_project_root(
+                    (str(git_dir / "a.py"), str(git_dir / "b.py"), str(hg_dir))
+                ),
+                black.find_project_root((str(root),)),
+            )
+            self.assertEqual(
+                black.find_project_root((str(not_hg_dir / "a.py"),)),
+                (hg_dir, ".hg directory"),
+            )
+
+    @pytest.mark.skipif(
+        sys.platform == "win32" or os.geteuid() == 0,
+        reason="needs POSIX permissions that apply to the current user",
+    )
+    def test_find_project_root_execute_only_directory(self) -> None:
+        with TemporaryDirectory() as workspace:
+            project = Path(workspace).resolve() / "project"
+            (project / ".git").mkdir(parents=True)
+            project.chmod(0o311)
+            try:
+                self.assertEqual(
+                    black.find_project_root((str(project / "a.py"),)),
+                    (project, ".git directory"),
+                )
+            finally:
+                project.chmod(0o700)
+
+    def test_find_project_root_clear_caches(self) -> None:
+        with TemporaryDirectory() as workspace:
+            root = Path(workspace).resolve()
+            project = root / "project"
+            project.mkdir()
+            src = str(project / "a.py")
+
+            self.assertNotEqual(black.find_project_root((src,))[0], project)
+
+            (project / ".git").mkdir()
+            # The earlier result for `project` is remembered, even for different
+            # sources that find_project_root() itself hasn't seen yet...
+            self.assertNotEqual(
+                black.find_project_root((str(project / "b.py"),))[0], project
+            )
+            black.files.clear_caches()
+            # ...until the caches are cleared.
+            self.assertEqual(
+                black.find_project_root((src,)), (project, ".git directory")
+            )
+
+    def test_cached_resolve_symlinked_parent(self) -> None:
+        with TemporaryDirectory() as workspace:
+            root = Path(workspace).resolve()
+            actual = root / "actual"
+            actual.mkdir()
+            symlink = root / "symlink"
+            try:
+                symlink.symlink_to(actual, target_is_directory=True)
+            except (OSError, NotImplementedError) as e:
+                self.skipTest(f"Can't create symlinks: {e}")
+
+            self.assertEqual(
+                black.files._cached_resolve(symlink / "sub" / "a.py"),
+                actual / "sub" / "a.py",
+            )
+            self.assertEqual(black.files._cached_resolve(actual), actual)
+
+    @pytest.mark.skipif(
+        sys.platform == "win32" or os.geteuid() == 0,
+        reason="needs POSIX permissions that apply to the current user",
+    )
+    def test_cached_resolve_untraversable_parent(self) -> None:
+        with TemporaryDirectory() as workspace:
+            noexec = Path(workspace).resolve() / "noexec"
+            noexec.mkdir()
+            path = noexec / "sub" / "a.py"
+            noexec.chmod(0o600)
+            try:
+                self.assertEqual(black.files._cached_resolve(path), path.resolve())
+            finally:
+                noexec.chmod(0o700)
+
     @patch(
         "black.files.find_user_pyproject_toml",
     )
@@ -2549,6 +2678,61 @@ def test_invalid_nested_gitignore(self) -> None:
             re.IGNORECASE if isinstance(gitignore, WindowsPath) else 0,
         )
 
+    def test_gitignore_reread_when_changed(self) -> None:
+        with TemporaryDirectory() as workspace:
+            root = Path(workspace)
+            assert not black.files.get_gitignore(root).match_file("a.py")
+
+            gitignore = root / ".gitignore"
+            gitignore.write_text("a.py\n", encoding="utf-8")
+            spec = black.files.get_gitignore(root)
+            assert spec.match_file("a.py")
+            assert black.files.get_gitignore(root) is spec
+
+            gitignore.write_text("b.py\n*.pyi\n", encoding="utf-8")
+            spec = black.files.get_gitignore(root)
+            assert not spec.match_file("a.py")
+            assert spec.match_file("b.py")
+
+            gitignore.unlink()
+            assert not black.files.get_gitignore(root).match_file("b.py")
+
+    def test_gitignore_cache_is_bounded(self) -> None:
+        with TemporaryDirectory() as workspace:
+            root = Path(workspace)
+            black.files.get_gitignore(root)
+            for i in range(black.files._GITIGNORE_CACHE_SIZE):
+                black.files.get_gitignore(root / str(i))
+            cache = black.files._GITIGNORE_CACHE
+            assert len(cache) <= black.files._GITIGNORE_CACHE_SIZE
+            assert root not in cache
+            assert root / "0" in cache
+
+    def test_gitignore_content_cache_is_bounded(self) -> None:
+        with TemporaryDirectory() as workspace:
+            root = Path(workspace)
+            gitignore = root / ".gitignore"
+            for i in range(black.files._GITIGNORE_CACHE_SIZE + 1):
+                gitignore.write_text(f"file{i}.py\n", encoding="utf-8")
+                # Make sure every version counts as changed, whatever the mtime
+                # resolution of the file system.
+                black.files._GITIGNORE_CACHE.pop(root, None)
+                black.files.get_gitignore(root)
+            cache = black.files._PATHSPEC_BY_CONTENT
+            assert len(cache) <= black.files._GITIGNORE_CACHE_SIZE
+            assert "file0.py\n" not in cache
+
+    def test_identical_gitignores_share_pathspec(self) -> None:
+        with TemporaryDirectory() as workspace:
+            first = Path(workspace) / "first"
+            second = Path(workspace) / "second"
+            for root in (first, second):
+                root.mkdir()
+                (root / ".gitignore").write_text("*.log\nbuild/\n", encoding="utf-8")
+
+            spec = black.files.get_gitignore(first)
+            assert black.files.get_gitignore(second) is spec
+
     def test_gitignore_that_ignores_subfolders(self) -> None:
         # If gitignore with */* is in root
         root = Path(DATA_DIR / "ignore_subfolders_gitignore_tests" / "subdir")